@@ -2,6 +2,7 @@ import asyncio
 import functools
 import inspect
 import logging
+import weakref
 
 from aiocache.base import SENTINEL
 from aiocache.lock import RedLock
@@ -9,7 +10,82 @@ from aiocache.lock import RedLock
 logger = logging.getLogger(__name__)
 
 
-class cached:
+class _PerLoop:
+    """Creates and keeps one ``factory()`` result per running event loop."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._by_loop = weakref.WeakKeyDictionary()
+
+    def get(self):
+        loop = asyncio.get_running_loop()
+        value = self._by_loop.get(loop)
+        if value is None:
+            value = self._by_loop[loop] = self.factory()
+        return value
+
+
+class _CacheMixin:
+    """Gives the decorators access to their cache, either shared or created per event loop."""
+
+    def _set_cache(self, cache, cache_factory):
+        if cache is not None and cache_factory is not None:
+            raise TypeError("cache and cache_factory can't be passed together")
+        self.cache = cache
+        self._loop_caches = None if cache_factory is None else _PerLoop(cache_factory)
+
+    def _get_cache(self):
+        if self._loop_caches is None:
+            return self.cache
+        return self._loop_caches.get()
+
+
+class _BatchedWriter:
+    """
+    Coalesces background ``(key, value)`` writes into ``write(pairs)`` calls. The pending pairs
+    are written once there are ``batch_size`` of them, ``flush_interval`` seconds after the first
+    one, or when the pending flush is cancelled because the event loop is shutting down.
+    """
+
+    def __init__(self, write, batch_size=128, flush_interval=0.05):
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._timer = None
+        self._tasks = set()
+
+    def put(self, key, value):
+        self._pending[key] = value
+        if len(self._pending) >= self.batch_size:
+            self._spawn(self._write_pending())
+        elif self._timer is None:
+            self._timer = self._spawn(self._flush_later())
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.flush_interval)
+        finally:
+            self._timer = None
+            await self._write_pending()
+
+    async def _write_pending(self):
+        pairs, self._pending = list(self._pending.items()), {}
+        if not pairs:
+            return
+        try:
+            await self.write(pairs)
+        except Exception:
+            logger.exception("Couldn't set %s, unexpected error", pairs)
+
+
+class cached(_CacheMixin):
     """
     Caches the functions return value into a key generated with module_name, function_name
     and args. The cache is available in the function object as ``<function_name>.cache``.
@@ -26,28 +102,58 @@ class cached:
     :param noself: bool if you are decorating a class function, by default self is also used to
         generate the key. This will result in same function calls done by different class instances
         to use different cache keys. Use noself=True if you want to ignore it.
+    :param batch_writes: bool to coalesce the background writes of concurrent calls (made with
+        ``aiocache_wait_for_write=False``) into a single ``multi_set``, flushed every
+        ``batch_size`` values or ``flush_interval`` seconds. Writes that are waited for are not
+        batched. Default is False.
+    :param batch_size: int number of values that triggers the flush of the batched writes.
+        Default is 128.
+    :param flush_interval: float seconds to wait for more values before flushing the batched
+        writes. Default is 0.05.
+    :param coalesce: bool to share a single call of the function between the concurrent calls
+        that miss the cache for the same key. Only the first of them calls the function and
+        writes the result, the others wait for it. If that first call is cancelled, one of the
+        waiting calls takes over. Default is False.
+    :param cache_factory: Callable returning a new cache instance, used instead of ``cache`` to
+        create one cache per event loop, as caches may hold resources bound to the loop they
+        were first used in (e.g. connection pools). ``<function_name>.cache`` is None then.
+        It can't be passed together with ``cache``.
     """
 
     def __init__(
         self,
-        cache,
+        cache=None,
         *,
         ttl=SENTINEL,
         key_builder=None,
         skip_cache_func=lambda x: False,
         noself=False,
+        batch_writes=False,
+        batch_size=128,
+        flush_interval=0.05,
+        coalesce=False,
+        cache_factory=None,
     ):
         self.ttl = ttl
         self.key_builder = key_builder
         self.skip_cache_func = skip_cache_func
         self.noself = noself
-        self.cache = cache
+        self._set_cache(cache, cache_factory)
+        self.coalesce = coalesce
+        self._writers = None
+        if batch_writes:
+            self._writers = _PerLoop(
+                lambda: _BatchedWriter(self._multi_set_in_cache, batch_size, flush_interval)
+            )
+        self._inflight = _PerLoop(dict)
+        self._background_tasks = set()
 
     def __call__(self, f):
         @functools.wraps(f)
         async def wrapper(*args, **kwargs):
             return await self.decorator(f, *args, **kwargs)
 
+        wrapper.__signature__ = inspect.signature(f)
         wrapper.cache = self.cache
         return wrapper
 
@@ -61,7 +167,12 @@ class cached:
             if value is not None:
                 return value
 
-        result = await f(*args, **kwargs)
+        if self.coalesce:
+            result, shared = await self._coalesced_call(key, f, args, kwargs)
+            if shared:
+                return result
+        else:
+            result = await f(*args, **kwargs)
 
         if self.skip_cache_func(result):
             return result
@@ -69,12 +180,46 @@ class cached:
         if cache_write:
             if aiocache_wait_for_write:
                 await self.set_in_cache(key, result)
+            elif self._writers is not None:
+                self._writers.get().put(key, result)
             else:
                 # TODO: Use aiojobs to avoid warnings.
-                asyncio.create_task(self.set_in_cache(key, result))
+                task = asyncio.create_task(self.set_in_cache(key, result))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
 
         return result
 
+    async def _coalesced_call(self, key, f, args, kwargs):
+        """Return the result of ``f`` and whether it was shared by another call in flight."""
+        inflight_calls = self._inflight.get()
+        while key in inflight_calls:
+            inflight = inflight_calls[key]
+            try:
+                return await asyncio.shield(inflight), True
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The call in flight was cancelled, this one takes over.
+
+        inflight = asyncio.get_running_loop().create_future()
+        # Retrieve the exception so it isn't logged when no other call is waiting for it.
+        inflight.add_done_callback(lambda fut: fut.cancelled() or fut.exception())
+        inflight_calls[key] = inflight
+        try:
+            result = await f(*args, **kwargs)
+        except Exception as e:
+            inflight.set_exception(e)
+            raise
+        except BaseException:
+            inflight.cancel()
+            raise
+        finally:
+            del inflight_calls[key]
+
+        inflight.set_result(result)
+        return result, False
+
     def get_cache_key(self, f, args, kwargs):
         if self.key_builder:
             return self.key_builder(f, *args, **kwargs)
@@ -92,17 +237,20 @@ class cached:
 
     async def get_from_cache(self, key):
         try:
-            return await self.cache.get(key)
+            return await self._get_cache().get(key)
         except Exception:
             logger.exception("Couldn't retrieve %s, unexpected error", key)
         return None
 
     async def set_in_cache(self, key, value):
         try:
-            await self.cache.set(key, value, ttl=self.ttl)
+            await self._get_cache().set(key, value, ttl=self.ttl)
         except Exception:
             logger.exception("Couldn't set %s in key %s, unexpected error", value, key)
 
+    async def _multi_set_in_cache(self, pairs):
+        await self._get_cache().multi_set(pairs, ttl=self.ttl)
+
 
 class cached_stampede(cached):
     """
@@ -126,9 +274,16 @@ class cached_stampede(cached):
     :param noself: bool if you are decorating a class function, by default self is also used to
         generate the key. This will result in same function calls done by different class instances
         to use different cache keys. Use noself=True if you want to ignore it.
+    :param cache_factory: Callable returning a new cache instance, used instead of ``cache`` to
+        create one cache per event loop, as caches may hold resources bound to the loop they
+        were first used in (e.g. connection pools). ``<function_name>.cache`` is None then.
+        It can't be passed together with ``cache``.
     """
 
-    def __init__(self, cache, lease=2, **kwargs):
+    def __init__(self, cache=None, lease=2, **kwargs):
+        for name in ("batch_writes", "batch_size", "flush_interval", "coalesce"):
+            if name in kwargs:
+                raise TypeError(f"cached_stampede() got an unexpected keyword argument '{name}'")
         super().__init__(cache, **kwargs)
         self.lease = lease
 
@@ -139,7 +294,7 @@ class cached_stampede(cached):
         if value is not None:
             return value
 
-        async with RedLock(self.cache, key, self.lease):
+        async with RedLock(self._get_cache(), key, self.lease):
             value = await self.get_from_cache(key)
             if value is not None:
                 return value
@@ -154,17 +309,24 @@ class cached_stampede(cached):
         return result
 
 
-def _get_args_dict(func, args, kwargs):
+@functools.lru_cache(maxsize=1024)
+def _args_spec(func):
+    """Return the positional argument names and the defaults of ``func``."""
     defaults = {
         arg_name: arg.default
         for arg_name, arg in inspect.signature(func).parameters.items()
         if arg.default is not inspect._empty  # TODO: bug prone..
     }
     args_names = func.__code__.co_varnames[: func.__code__.co_argcount]
+    return args_names, defaults
+
+
+def _get_args_dict(func, args, kwargs):
+    args_names, defaults = _args_spec(func)
     return {**defaults, **dict(zip(args_names, args)), **kwargs}
 
 
-class multi_cached:
+class multi_cached(_CacheMixin):
     """
     Only supports functions that return dict-like structures. This decorator caches each key/value
     of the dict-like object returned by the function. The dict keys of the returned data should
@@ -211,6 +373,10 @@ class multi_cached:
         if that key-value pair should not be cached (or False to store in cache).
         The keys and values to be passed are taken from the wrapped function result.
     :param ttl: int seconds to store the keys. Default is 0 which means no expiration.
+    :param cache_factory: Callable returning a new cache instance, used instead of ``cache`` to
+        create one cache per event loop, as caches may hold resources bound to the loop they
+        were first used in (e.g. connection pools). ``<function_name>.cache`` is None then.
+        It can't be passed together with ``cache``.
     """
 
     def __init__(
@@ -221,18 +387,23 @@ class multi_cached:
         key_builder=None,
         skip_cache_func=lambda k, v: False,
         ttl=SENTINEL,
+        cache_factory=None,
     ):
-        self.cache = cache
+        self._set_cache(cache, cache_factory)
+        self._background_tasks = set()
         self.keys_from_attr = keys_from_attr
         self.key_builder = key_builder or (lambda key, f, *args, **kwargs: key)
         self.skip_cache_func = skip_cache_func
         self.ttl = ttl
 
     def __call__(self, f):
+        _args_spec(f)
+
         @functools.wraps(f)
         async def wrapper(*args, **kwargs):
             return await self.decorator(f, *args, **kwargs)
 
+        wrapper.__signature__ = inspect.signature(f)
         wrapper.cache = self.cache
         return wrapper
 
@@ -273,20 +444,31 @@ class multi_cached:
                 await self.set_in_cache(to_cache, f, args, kwargs)
             else:
                 # TODO: Use aiojobs to avoid warnings.
-                asyncio.create_task(self.set_in_cache(to_cache, f, args, kwargs))
+                task = asyncio.create_task(self.set_in_cache(to_cache, f, args, kwargs))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
 
         return result
 
     def get_cache_keys(self, f, args, kwargs):
-        args_dict = _get_args_dict(f, args, kwargs)
-        orig_keys = args_dict.get(self.keys_from_attr, []) or []
-        cache_keys = [self.key_builder(key, f, *args, **kwargs) for key in orig_keys]
-
-        args_names = f.__code__.co_varnames[: f.__code__.co_argcount]
-        new_args = list(args)
+        args_names, defaults = _args_spec(f)
         keys_index = -1
-        if self.keys_from_attr in args_names and self.keys_from_attr not in kwargs:
+        if self.keys_from_attr in kwargs:
+            orig_keys = kwargs[self.keys_from_attr]
+        elif self.keys_from_attr in args_names[: len(args)]:
             keys_index = args_names.index(self.keys_from_attr)
+            orig_keys = args[keys_index]
+        else:
+            # Keys taken from the default are passed back as a kwarg.
+            orig_keys = defaults.get(self.keys_from_attr)
+
+        # The args only need to be copied when the keys will be replaced in them.
+        new_args = list(args) if keys_index > -1 else args
+        if not orig_keys:
+            return (), (), new_args, keys_index
+
+        key_builder = self.key_builder
+        cache_keys = [key_builder(key, f, *args, **kwargs) for key in orig_keys]
 
         return orig_keys, cache_keys, new_args, keys_index
 
@@ -294,7 +476,7 @@ class multi_cached:
         if not keys:
             return []
         try:
-            values = await self.cache.multi_get(keys)
+            values = await self._get_cache().multi_get(keys)
             return values
         except Exception:
             logger.exception("Couldn't retrieve %s, unexpected error", keys)
@@ -302,7 +484,7 @@ class multi_cached:
 
     async def set_in_cache(self, result, fn, fn_args, fn_kwargs):
         try:
-            await self.cache.multi_set(
+            await self._get_cache().multi_set(
                 [(self.key_builder(k, fn, *fn_args, **fn_kwargs), v) for k, v in result.items()],
                 ttl=self.ttl,
             )
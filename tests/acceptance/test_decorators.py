@@ -44,6 +44,30 @@ class TestCached:
         await fn("self", 1, 3)
         assert await cache.exists(build_key(fn, "self", 1, 3)) is True
 
+    async def test_cached_batch_writes(self, mocker, cache):
+        mocker.spy(cache, "multi_set")
+
+        @cached(cache=cache, key_builder=lambda f, key: key, batch_writes=True)
+        async def fn(key):
+            return str(key)
+
+        await asyncio.gather(*(fn(k, aiocache_wait_for_write=False) for k in Keys))
+        await asyncio.sleep(0.1)
+
+        assert cache.multi_set.call_count == 1
+        assert await cache.get(Keys.KEY) == str(Keys.KEY)
+        assert await cache.get(Keys.KEY_1) == str(Keys.KEY_1)
+
+    async def test_cached_coalesce(self, mocker, cache):
+        mocker.spy(cache, "set")
+        decorator = cached(cache=cache, key_builder=lambda *args, **kw: Keys.KEY, coalesce=True)
+
+        results = await asyncio.gather(*(decorator(stub)(1, seconds=0.1) for _ in range(3)))
+
+        assert len(set(results)) == 1
+        assert cache.set.call_count == 1
+        assert await cache.get(Keys.KEY) == results[0]
+
     @pytest.mark.parametrize("decorator", (cached, cached_stampede))
     async def test_cached_skip_cache_func(self, cache, decorator):
         @decorator(cache=cache, skip_cache_func=lambda r: r is None)
@@ -3,6 +3,7 @@ from unittest.mock import create_autospec, patch
 
 import pytest
 
+from aiocache.backends.memory import SimpleMemoryCache
 from aiocache.plugins import BasePlugin
 from ..utils import AbstractBaseCache, ConcreteBaseCache
 
@@ -28,6 +29,21 @@ def mock_base_cache():
         yield cache
 
 
+@pytest.fixture(scope="session")
+def memory_cache_factory():
+    """Return a factory of SimpleMemoryCache instances which are emptied once the session ends."""
+    caches = []
+
+    def make():
+        cache = SimpleMemoryCache()
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache._cache.clear()
+
+
 @pytest.fixture
 def abstract_base_cache():
     return AbstractBaseCache()
@@ -1,18 +1,54 @@
 import asyncio
+import functools
 import inspect
 import random
-import sys
-from unittest.mock import ANY, create_autospec, patch
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from unittest.mock import ANY, AsyncMock, call, create_autospec, patch
 
 import pytest
 
 from aiocache import cached, cached_stampede, multi_cached
-from aiocache.backends.memory import SimpleMemoryCache
 from aiocache.base import SENTINEL
-from aiocache.decorators import _get_args_dict
+from aiocache.decorators import _args_spec, _get_args_dict
 from aiocache.lock import RedLock
+from ..utils import ConcreteBaseCache
 
 
+class _FakeLock:
+    """Stand-in for a ``RedLock`` instance recording how it is entered and exited."""
+
+    def __init__(self):
+        self.aenter = AsyncMock(return_value=None)
+        self.aexit = AsyncMock(return_value=None)
+
+    async def __aenter__(self):
+        return await self.aenter()
+
+    async def __aexit__(self, *exc_info):
+        return await self.aexit(*exc_info)
+
+
+def count_calls(fn):
+    """Record the calls to ``fn`` and raise ``side_effect`` instead of calling it if set."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        wrapper.call_count += 1
+        wrapper.last_call = (args, kwargs)
+        if wrapper.side_effect is not None:
+            raise wrapper.side_effect
+        return await fn(*args, **kwargs)
+
+    wrapper.call_count = 0
+    wrapper.last_call = None
+    wrapper.side_effect = None
+    return wrapper
+
+
+@count_calls
 async def stub(*args, value=None, seconds=0, **kwargs):
     await asyncio.sleep(seconds)
     if value:
@@ -20,6 +56,37 @@ async def stub(*args, value=None, seconds=0, **kwargs):
     return str(random.randint(1, 50))
 
 
+@pytest.fixture(scope="module")
+def mock_cache():
+    return create_autospec(ConcreteBaseCache())
+
+
+@pytest.fixture(autouse=True)
+def reset_mock_cache(mock_cache):
+    yield
+    mock_cache.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture(scope="module")
+def redlock_spec():
+    return create_autospec(RedLock)
+
+
+@pytest.fixture
+def mock_redlock(mocker, redlock_spec):
+    mocker.patch("aiocache.decorators.RedLock", new=redlock_spec)
+    yield redlock_spec
+    redlock_spec.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture(autouse=True)
+def reset_stubs():
+    for fn in (stub, stub_dict):
+        fn.call_count = 0
+        fn.last_call = None
+        fn.side_effect = None
+
+
 class TestCached:
     @pytest.fixture
     def decorator(self, mock_cache):
@@ -30,13 +97,8 @@ class TestCached:
         d = decorator(stub)
         yield d
 
-    @pytest.fixture(autouse=True)
-    def spy_stub(self, mocker):
-        module = sys.modules[globals()["__name__"]]
-        mocker.spy(module, "stub")
-
-    def test_init(self):
-        cache = SimpleMemoryCache()
+    def test_init(self, memory_cache_factory):
+        cache = memory_cache_factory()
         c = cached(
             ttl=1,
             key_builder=lambda *args, **kw: "key",
@@ -48,33 +110,42 @@ class TestCached:
         assert c.key_builder() == "key"
         assert c.cache is cache
 
-    def test_get_cache_key_with_key(self, decorator):
-        decorator.key_builder = lambda *args, **kw: "key"
-        assert decorator.get_cache_key(stub, (1, 2), {"a": 1, "b": 2}) == "key"
-
-    def test_get_cache_key_without_key_and_attr(self, decorator):
-        assert (
-            decorator.get_cache_key(stub, (1, 2), {"a": 1, "b": 2})
-            == "stub(1, 2)[('a', 1), ('b', 2)]"
-        )
-
-    def test_get_cache_key_without_key_and_attr_noself(self, decorator):
-        decorator.noself = True
-        assert (
-            decorator.get_cache_key(stub, ("self", 1, 2), {"a": 1, "b": 2})
-            == "stub(1, 2)[('a', 1), ('b', 2)]"
+    @pytest.mark.parametrize(
+        "attrs, args, kwargs, expected",
+        (
+            ({"key_builder": lambda *args, **kw: "key"}, (1, 2), {"a": 1, "b": 2}, "key"),
+            ({}, (1, 2), {"a": 1, "b": 2}, __name__ + "stub(1, 2)[('a', 1), ('b', 2)]"),
+            (
+                {"noself": True},
+                ("self", 1, 2),
+                {"a": 1, "b": 2},
+                __name__ + "stub(1, 2)[('a', 1), ('b', 2)]",
+            ),
+            (
+                {"key_builder": lambda *args, **kwargs: kwargs["market"].upper()},
+                (),
+                {"market": "es"},
+                "ES",
+            ),
+        ),
+        ids=("key", "without_key_and_attr", "without_key_and_attr_noself", "key_builder"),
+    )
+    def test_get_cache_key(self, decorator, attrs, args, kwargs, expected):
+        for name, value in attrs.items():
+            setattr(decorator, name, value)
+        assert decorator.get_cache_key(stub, args, kwargs) == expected
+
+    def test_get_cache_key_ignores_kwargs_order(self, decorator):
+        assert decorator.get_cache_key(stub, (), {"a": 1, "b": 2}) == decorator.get_cache_key(
+            stub, (), {"b": 2, "a": 1}
         )
 
-    def test_get_cache_key_with_key_builder(self, decorator):
-        decorator.key_builder = lambda *args, **kwargs: kwargs["market"].upper()
-        assert decorator.get_cache_key(stub, (), {"market": "es"}) == "ES"
-
     async def test_calls_get_and_returns(self, decorator, decorator_call):
         decorator.cache.get.return_value = 1
 
         await decorator_call()
 
-        decorator.cache.get.assert_called_with("stub()[]")
+        decorator.cache.get.assert_called_with(__name__ + "stub()[]")
         assert decorator.cache.set.call_count == 0
         assert stub.call_count == 0
 
@@ -99,7 +170,8 @@ class TestCached:
 
         await decorator_call(cache_read=False, cache_write=False)
 
-        stub.assert_called_once_with()
+        assert stub.call_count == 1
+        assert stub.last_call == ((), {})
 
     async def test_get_from_cache_returns(self, decorator, decorator_call):
         decorator.cache.get.return_value = 1
@@ -121,8 +193,9 @@ class TestCached:
         await decorator_call(value="value")
 
         assert decorator.get_from_cache.call_count == 1
-        decorator.set_in_cache.assert_called_with("stub()[('value', 'value')]", "value")
-        stub.assert_called_once_with(value="value")
+        decorator.set_in_cache.assert_called_with(__name__ + "stub()[('value', 'value')]", "value")
+        assert stub.call_count == 1
+        assert stub.last_call == ((), {"value": "value"})
 
     async def test_calls_fn_raises_exception(self, decorator, decorator_call):
         decorator.cache.get.return_value = None
@@ -142,7 +215,114 @@ class TestCached:
             await decorator_call(aiocache_wait_for_write=False, value="value")
 
         decorator.set_in_cache.assert_not_awaited()
-        # decorator.set_in_cache.assert_called_once_with("stub()[('value', 'value')]", "value")
+        assert len(decorator._background_tasks) == 1
+
+        await asyncio.gather(*decorator._background_tasks)
+        decorator.set_in_cache.assert_awaited_once_with(
+            __name__ + "stub()[('value', 'value')]", "value"
+        )
+        assert not decorator._background_tasks
+
+    async def test_coalesces_concurrent_calls(self, mock_cache):
+        mock_cache.get.return_value = None
+        decorator = cached(cache=mock_cache, coalesce=True)
+        call = decorator(stub)
+
+        results = await asyncio.gather(*(call(value="value", seconds=0.01) for _ in range(3)))
+
+        assert results == ["value", "value", "value"]
+        assert stub.call_count == 1
+        assert mock_cache.set.call_count == 1
+        assert decorator._inflight.get() == {}
+
+    async def test_coalesce_takes_over_cancelled_call(self, mock_cache):
+        mock_cache.get.return_value = None
+        decorator = cached(cache=mock_cache, coalesce=True)
+        call = decorator(stub)
+
+        leader = asyncio.create_task(call(value="value", seconds=0.01))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(call(value="value", seconds=0.01))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "value"
+        assert leader.cancelled()
+        assert stub.call_count == 2
+        assert mock_cache.set.call_count == 1
+        assert decorator._inflight.get() == {}
+
+    async def test_coalesce_cancelled_follower(self, mock_cache):
+        mock_cache.get.return_value = None
+        decorator = cached(cache=mock_cache, coalesce=True)
+        call = decorator(stub)
+
+        leader = asyncio.create_task(call(value="value", seconds=0.01))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(call(value="value", seconds=0.01))
+        await asyncio.sleep(0)
+        follower.cancel()
+
+        assert await leader == "value"
+        assert follower.cancelled()
+        assert stub.call_count == 1
+        assert decorator._inflight.get() == {}
+
+    async def test_coalesce_shares_exception(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        @count_calls
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("foo")
+
+        decorator = cached(cache=mock_cache, coalesce=True)
+        call = decorator(fn)
+        results = await asyncio.gather(call(), call(), return_exceptions=True)
+
+        assert [str(r) for r in results] == ["foo", "foo"]
+        assert fn.call_count == 1
+        assert mock_cache.set.call_count == 0
+        assert decorator._inflight.get() == {}
+
+    def test_coalesce_per_loop(self, mock_cache):
+        mock_cache.get.return_value = None
+        barrier = threading.Barrier(2, timeout=5)
+
+        async def fn():
+            # Both loops have a call in flight for the same key.
+            await asyncio.to_thread(barrier.wait)
+            return "value"
+
+        call = cached(cache=mock_cache, coalesce=True)(fn)
+        with ThreadPoolExecutor(2) as pool:
+            results = list(pool.map(lambda _: asyncio.run(call()), range(2)))
+
+        assert results == ["value", "value"]
+
+    def test_rejects_cache_and_cache_factory(self):
+        with pytest.raises(TypeError, match="cache and cache_factory can't be passed together"):
+            cached(cache=object(), cache_factory=object)
+
+    def test_cache_factory_per_loop(self):
+        caches = []
+
+        def factory():
+            caches.append(create_autospec(ConcreteBaseCache()))
+            caches[-1].get.return_value = None
+            return caches[-1]
+
+        async def calls(fn):
+            await fn(value="value")
+            await fn(value="value")
+
+        fn = cached(cache_factory=factory)(stub)
+        asyncio.run(calls(fn))
+        asyncio.run(calls(fn))
+
+        assert fn.cache is None
+        assert len(caches) == 2
+        assert [c.set.call_count for c in caches] == [2, 2]
 
     async def test_set_calls_set(self, decorator, decorator_call):
         await decorator.set_in_cache("key", "value")
@@ -157,6 +337,67 @@ class TestCached:
         decorator.cache.set.side_effect = Exception
         assert await decorator.set_in_cache("key", "value") is None
 
+    async def test_batch_writes(self, mock_cache):
+        mock_cache.get.return_value = None
+        decorator = cached(
+            cache=mock_cache, ttl=10, key_builder=lambda f, value: value, batch_writes=True
+        )
+        fn = decorator(stub)
+
+        await asyncio.gather(*(fn(value=v, aiocache_wait_for_write=False) for v in "abc"))
+        assert mock_cache.multi_set.call_count == 0
+
+        await asyncio.sleep(0.1)
+        mock_cache.multi_set.assert_called_once_with([("a", "a"), ("b", "b"), ("c", "c")], ttl=10)
+        assert mock_cache.set.call_count == 0
+
+    async def test_batch_writes_flushes_full_batch(self, mock_cache):
+        mock_cache.get.return_value = None
+        decorator = cached(
+            cache=mock_cache, key_builder=lambda f, value: value, batch_writes=True, batch_size=2
+        )
+        fn = decorator(stub)
+
+        await asyncio.gather(*(fn(value=v, aiocache_wait_for_write=False) for v in "ab"))
+        await asyncio.sleep(0)
+        mock_cache.multi_set.assert_called_once_with([("a", "a"), ("b", "b")], ttl=SENTINEL)
+
+        await asyncio.sleep(0.1)
+        assert mock_cache.multi_set.call_count == 1
+
+    async def test_batch_writes_skips_waited_writes(self, mock_cache):
+        mock_cache.get.return_value = None
+        decorator = cached(cache=mock_cache, key_builder=lambda f, value: value, batch_writes=True)
+
+        await decorator(stub)(value="a")
+
+        mock_cache.set.assert_called_once_with("a", "a", ttl=SENTINEL)
+        assert mock_cache.multi_set.call_count == 0
+
+    async def test_batch_writes_catches_exception(self, mock_cache):
+        mock_cache.get.return_value = None
+        mock_cache.multi_set.side_effect = Exception
+        decorator = cached(cache=mock_cache, key_builder=lambda f, value: value, batch_writes=True)
+
+        assert await decorator(stub)(value="a", aiocache_wait_for_write=False) == "a"
+        await asyncio.sleep(0.1)
+        assert mock_cache.multi_set.call_count == 1
+
+    def test_batch_writes_per_loop(self, mock_cache):
+        mock_cache.get.return_value = None
+        decorator = cached(cache=mock_cache, key_builder=lambda f, value: value, batch_writes=True)
+        fn = decorator(stub)
+
+        asyncio.run(fn(value="a", aiocache_wait_for_write=False))
+        asyncio.run(fn(value="b", aiocache_wait_for_write=False))
+        asyncio.run(fn(value="c"))
+
+        assert mock_cache.multi_set.call_args_list == [
+            call([("a", "a")], ttl=SENTINEL),
+            call([("b", "b")], ttl=SENTINEL),
+        ]
+        mock_cache.set.assert_called_once_with("c", "c", ttl=SENTINEL)
+
     async def test_decorate(self, mock_cache):
         mock_cache.get.return_value = None
 
@@ -175,6 +416,7 @@ class TestCached:
 
         assert what.__name__ == "what"
         assert str(inspect.signature(what)) == "(self, a, b)"
+        assert "__signature__" in vars(what)
         assert inspect.getfullargspec(what.__wrapped__).args == ["self", "a", "b"]
 
     async def test_reuses_cache_instance(self, mock_cache):
@@ -197,16 +439,16 @@ class TestCachedStampede:
     def decorator_call(self, decorator):
         yield decorator(stub)
 
-    @pytest.fixture(autouse=True)
-    def spy_stub(self, mocker):
-        module = sys.modules[globals()["__name__"]]
-        mocker.spy(module, "stub")
-
     def test_inheritance(self, mock_cache):
         assert isinstance(cached_stampede(mock_cache), cached)
 
-    def test_init(self):
-        cache = SimpleMemoryCache()
+    @pytest.mark.parametrize("name", ("batch_writes", "batch_size", "flush_interval", "coalesce"))
+    def test_rejects_unsupported_options(self, mock_cache, name):
+        with pytest.raises(TypeError, match=name):
+            cached_stampede(mock_cache, **{name: True})
+
+    def test_init(self, memory_cache_factory):
+        cache = memory_cache_factory()
         c = cached_stampede(
             lease=3,
             ttl=1,
@@ -224,7 +466,7 @@ class TestCachedStampede:
 
         await decorator_call()
 
-        decorator.cache.get.assert_called_with("stub()[]")
+        decorator.cache.get.assert_called_with(__name__ + "stub()[]")
         assert decorator.cache.set.call_count == 0
         assert stub.call_count == 0
 
@@ -234,44 +476,50 @@ class TestCachedStampede:
         with pytest.raises(RuntimeError, match="foo"):
             assert await decorator_call()
 
-    async def test_calls_redlock(self, decorator, decorator_call):
+    async def test_calls_redlock(self, mock_redlock, decorator, decorator_call):
         decorator.cache.get.return_value = None
-        lock = create_autospec(RedLock, instance=True)
+        lock = _FakeLock()
+        mock_redlock.return_value = lock
 
-        with patch("aiocache.decorators.RedLock", autospec=True, return_value=lock):
-            await decorator_call(value="value")
+        await decorator_call(value="value")
 
-            assert decorator.cache.get.call_count == 2
-            assert lock.__aenter__.call_count == 1
-            assert lock.__aexit__.call_count == 1
-            decorator.cache.set.assert_called_with(
-                "stub()[('value', 'value')]", "value", ttl=SENTINEL
-            )
-            stub.assert_called_once_with(value="value")
+        assert decorator.cache.get.call_count == 2
+        lock.aenter.assert_awaited_once()
+        lock.aexit.assert_awaited_once()
+        decorator.cache.set.assert_called_with(
+            __name__ + "stub()[('value', 'value')]", "value", ttl=SENTINEL
+        )
+        assert stub.call_count == 1
+        assert stub.last_call == ((), {"value": "value"})
 
-    async def test_calls_locked_client(self, decorator, decorator_call):
+    async def test_calls_locked_client(self, mock_redlock, decorator, decorator_call):
         decorator.cache.get.side_effect = [None, None, None, "value"]
         decorator.cache._add.side_effect = [True, ValueError]
-        lock1 = create_autospec(RedLock, instance=True)
-        lock2 = create_autospec(RedLock, instance=True)
-
-        with patch("aiocache.decorators.RedLock", autospec=True, side_effect=[lock1, lock2]):
-            await asyncio.gather(decorator_call(value="value"), decorator_call(value="value"))
-
-            assert decorator.cache.get.call_count == 4
-            assert lock1.__aenter__.call_count == 1
-            assert lock1.__aexit__.call_count == 1
-            assert lock2.__aenter__.call_count == 1
-            assert lock2.__aexit__.call_count == 1
-            decorator.cache.set.assert_called_with(
-                "stub()[('value', 'value')]", "value", ttl=SENTINEL
-            )
-            assert stub.call_count == 1
+        lock1 = _FakeLock()
+        lock2 = _FakeLock()
+        mock_redlock.side_effect = [lock1, lock2]
+
+        await asyncio.gather(decorator_call(value="value"), decorator_call(value="value"))
+
+        assert decorator.cache.get.call_count == 4
+        lock1.aenter.assert_awaited_once()
+        lock1.aexit.assert_awaited_once()
+        lock2.aenter.assert_awaited_once()
+        lock2.aexit.assert_awaited_once()
+        decorator.cache.set.assert_called_with(
+            __name__ + "stub()[('value', 'value')]", "value", ttl=SENTINEL
+        )
+        assert stub.call_count == 1
 
 
+@count_calls
 async def stub_dict(*args, keys=None, **kwargs):
     values = {"a": random.randint(1, 50), "b": random.randint(1, 50), "c": random.randint(1, 50)}
-    return {k: values.get(k) for k in keys}
+    if not keys:
+        return {}
+    if len(keys) == 1:
+        return {keys[0]: values.get(keys[0])}
+    return dict(zip(keys, itemgetter(*keys)(defaultdict(lambda: None, values))))
 
 
 class TestMultiCached:
@@ -285,13 +533,8 @@ class TestMultiCached:
         decorator._conn = decorator.cache.get_connection()
         yield d
 
-    @pytest.fixture(autouse=True)
-    def spy_stub_dict(self, mocker):
-        module = sys.modules[globals()["__name__"]]
-        mocker.spy(module, "stub_dict")
-
-    def test_init(self):
-        cache = SimpleMemoryCache()
+    def test_init(self, memory_cache_factory):
+        cache = memory_cache_factory()
         mc = multi_cached(
             keys_from_attr="keys",
             key_builder=None,
@@ -309,13 +552,13 @@ class TestMultiCached:
 
     def test_get_cache_keys(self, decorator):
         keys = decorator.get_cache_keys(stub_dict, (), {"keys": ["a", "b"]})
-        assert keys == (["a", "b"], ["a", "b"], [], -1)
+        assert keys == (["a", "b"], ["a", "b"], (), -1)
 
     def test_get_cache_keys_empty_list(self, decorator):
-        assert decorator.get_cache_keys(stub_dict, (), {"keys": []}) == ([], [], [], -1)
+        assert decorator.get_cache_keys(stub_dict, (), {"keys": []}) == ((), (), (), -1)
 
     def test_get_cache_keys_missing_kwarg(self, decorator):
-        assert decorator.get_cache_keys(stub_dict, (), {}) == ([], [], [], -1)
+        assert decorator.get_cache_keys(stub_dict, (), {}) == ((), (), (), -1)
 
     def test_get_cache_keys_arg_key_from_attr(self, decorator):
         def fake(keys, a=1, b=2):
@@ -323,18 +566,50 @@ class TestMultiCached:
 
         assert decorator.get_cache_keys(fake, (["a"],), {}) == (["a"], ["a"], [["a"]], 0)
 
+    def test_get_cache_keys_arg_key_from_attr_default(self, decorator):
+        def fake(a, keys=("b",)):
+            """Dummy function."""
+
+        assert decorator.get_cache_keys(fake, (1,), {}) == (("b",), ["b"], (1,), -1)
+
+    def test_get_cache_keys_arg_key_from_attr_empty(self, decorator):
+        def fake(keys, a=1, b=2):
+            """Dummy function."""
+
+        assert decorator.get_cache_keys(fake, ([],), {}) == ((), (), [[]], 0)
+
     def test_get_cache_keys_with_none(self, decorator):
-        assert decorator.get_cache_keys(stub_dict, (), {"keys": None}) == ([], [], [], -1)
+        assert decorator.get_cache_keys(stub_dict, (), {"keys": None}) == ((), (), (), -1)
 
     def test_get_cache_keys_with_key_builder(self, decorator):
         decorator.key_builder = lambda key, *args, **kwargs: kwargs["market"] + "_" + key.upper()
         assert decorator.get_cache_keys(stub_dict, (), {"keys": ["a", "b"], "market": "ES"}) == (
             ["a", "b"],
             ["ES_A", "ES_B"],
-            [],
+            (),
             -1,
         )
 
+    def test_rejects_cache_and_cache_factory(self):
+        with pytest.raises(TypeError, match="cache and cache_factory can't be passed together"):
+            multi_cached(keys_from_attr="keys", cache=object(), cache_factory=object)
+
+    def test_cache_factory_per_loop(self):
+        caches = []
+
+        def factory():
+            caches.append(create_autospec(ConcreteBaseCache()))
+            caches[-1].multi_get.return_value = [None]
+            return caches[-1]
+
+        fn = multi_cached(keys_from_attr="keys", cache_factory=factory)(stub_dict)
+        asyncio.run(fn(keys=["a"]))
+        asyncio.run(fn(keys=["a"]))
+
+        assert fn.cache is None
+        assert len(caches) == 2
+        assert [c.multi_set.call_count for c in caches] == [1, 1]
+
     async def test_get_from_cache(self, decorator, decorator_call):
         decorator.cache.multi_get.return_value = [1, 2, 3]
 
@@ -381,7 +656,8 @@ class TestMultiCached:
 
         decorator.get_from_cache.assert_called_once_with("a", "b")
         decorator.set_in_cache.assert_called_with(ret, stub_dict, ANY, ANY)
-        stub_dict.assert_called_once_with(1, keys=["a", "b"], value="value")
+        assert stub_dict.call_count == 1
+        assert stub_dict.last_call == ((1,), {"keys": ["a", "b"], "value": "value"})
 
     async def test_cache_write_waits_for_future(self, mocker, decorator, decorator_call):
         mocker.spy(decorator, "set_in_cache")
@@ -393,12 +669,25 @@ class TestMultiCached:
     async def test_cache_write_doesnt_wait_for_future(self, mocker, decorator, decorator_call):
         mocker.spy(decorator, "set_in_cache")
         with patch.object(decorator, "get_from_cache", autospec=True, return_value=[None, None]):
-            with patch("aiocache.decorators.asyncio.ensure_future", autospec=True):
-                await decorator_call(1, keys=["a", "b"], value="value",
-                                     aiocache_wait_for_write=False)
+            await decorator_call(1, keys=["a", "b"], value="value",
+                                 aiocache_wait_for_write=False)
 
         decorator.set_in_cache.assert_not_awaited()
-        # decorator.set_in_cache.assert_called_once_with({"a": ANY, "b": ANY}, stub_dict, ANY, ANY)
+        assert len(decorator._background_tasks) == 1
+
+        await asyncio.gather(*decorator._background_tasks)
+        decorator.set_in_cache.assert_awaited_once_with({"a": ANY, "b": ANY}, stub_dict, ANY, ANY)
+        assert not decorator._background_tasks
+
+    async def test_calls_fn_with_default_keys(self, mock_cache):
+        mock_cache.multi_get.return_value = [None]
+
+        @multi_cached(cache=mock_cache, keys_from_attr="keys")
+        async def fn(a, keys=("b",)):
+            return {k: a for k in keys}
+
+        assert await fn(1) == {"b": 1}
+        mock_cache.multi_set.assert_called_once_with([("b", 1)], ttl=SENTINEL)
 
     async def test_calls_fn_with_only_missing_keys(self, mocker, decorator, decorator_call):
         mocker.spy(decorator, "set_in_cache")
@@ -407,7 +696,8 @@ class TestMultiCached:
         assert await decorator_call(1, keys=["a", "b"], value="value") == {"a": ANY, "b": ANY}
 
         decorator.set_in_cache.assert_called_once_with({"a": ANY, "b": ANY}, stub_dict, ANY, ANY)
-        stub_dict.assert_called_once_with(1, keys=["b"], value="value")
+        assert stub_dict.call_count == 1
+        assert stub_dict.last_call == ((1,), {"keys": ["b"], "value": "value"})
 
     async def test_calls_fn_raises_exception(self, decorator, decorator_call):
         decorator.cache.multi_get.return_value = [None]
@@ -436,7 +726,8 @@ class TestMultiCached:
 
         await decorator_call(1, keys=["a", "b"], cache_read=False, cache_write=False)
 
-        stub_dict.assert_called_once_with(1, keys=["a", "b"])
+        assert stub_dict.call_count == 1
+        assert stub_dict.last_call == ((1,), {"keys": ["a", "b"]})
 
     async def test_set_in_cache(self, decorator, decorator_call):
         await decorator.set_in_cache({"a": 1, "b": 2}, stub_dict, (), {})
@@ -475,10 +766,24 @@ class TestMultiCached:
 
         assert what.__name__ == "what"
         assert str(inspect.signature(what)) == "(self, keys=None, what=1)"
+        assert "__signature__" in vars(what)
         assert inspect.getfullargspec(what.__wrapped__).args == ["self", "keys", "what"]
 
-    async def test_key_builder(self):
-        @multi_cached(cache=SimpleMemoryCache(), keys_from_attr="keys",
+    async def test_computes_args_spec_on_decoration(self, mock_cache):
+        mock_cache.multi_get.return_value = [1]
+
+        async def what(keys=None):
+            """Dummy function."""
+
+        fn = multi_cached(cache=mock_cache, keys_from_attr="keys")(what)
+        misses = _args_spec.cache_info().misses
+        await fn(keys=["a"])
+
+        assert _args_spec.cache_info().misses == misses
+        mock_cache.multi_get.assert_called_with(("a",))
+
+    async def test_key_builder(self, memory_cache_factory):
+        @multi_cached(cache=memory_cache_factory(), keys_from_attr="keys",
                       key_builder=lambda key, _, keys: key + 1)
         async def f(keys=None):
             return {k: k * 3 for k in keys}
@@ -495,3 +800,13 @@ def test_get_args_dict():
 
     args_dict = _get_args_dict(fn, ("a", "b", "c", "d"), {"what": "what"})
     assert args_dict == {"a": "a", "b": "b", "keys": None, "what": "what"}
+
+
+def test_get_args_dict_reuses_spec():
+    def fn(a, b=2):
+        """Dummy function."""
+
+    assert _get_args_dict(fn, (1,), {}) == {"a": 1, "b": 2}
+    hits = _args_spec.cache_info().hits
+    assert _get_args_dict(fn, (3, 4), {}) == {"a": 3, "b": 4}
+    assert _args_spec.cache_info().hits == hits + 1